@@ -6,72 +6,317 @@ This script scans the local network for devices with port 5555 open,
 allows the user to select one with a GUI, and launches scrcpy to mirror the selected device.
 """
 
+import errno
 import os
+import random
 import socket
+import struct
 import subprocess
 import ipaddress
+import selectors
+import shutil
 import threading
 import time
-from queue import Queue
+from collections import deque
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+try:
+    # Optional: batch all connects through io_uring on Linux
+    import liburing
+except ImportError:
+    liburing = None
+
+try:
+    # Optional: find devices that advertise ADB over mDNS without a port scan
+    from zeroconf import IPVersion, ServiceBrowser, ServiceStateChange, Zeroconf
+except ImportError:
+    Zeroconf = None
+
+try:
+    # Optional: read the real netmask instead of assuming a /24
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    # Optional: talk to the X server directly instead of forking xdotool
+    from Xlib import X, XK, display as xdisplay, error as xerror
+    from Xlib.protocol import event as xevent
+except ImportError:
+    xdisplay = None
+
 class IPScanner:
     def __init__(self):
         self.open_ips = []
-        self.ip_queue = Queue()
-        self.print_lock = threading.Lock()
-        
-    def get_network_prefix(self):
-        """Get the local network prefix"""
+        # Called with each open IP as soon as it is found
+        self._on_found = None
+        # Durations of recent successful connects, used to tune the timeout
+        self.rtts = deque(maxlen=256)
+        # Upper bound on sockets open at once, well below the usual fd limit
+        self.max_inflight = 256
+        # Host strings of the last scanned network, rebuilt only when it changes
+        self._network = None
+        self._hosts = []
+        
+    def get_local_ip(self):
+        """Get the IP of the interface used to reach the network"""
+        # Connecting a UDP socket sends nothing, it only makes the kernel
+        # pick the outbound interface, whose address is our local IP
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         try:
-            # Run hostname command to get local IP
-            result = subprocess.run(['hostname', '-I'], capture_output=True, text=True)
-            local_ip = result.stdout.strip().split()[0]
-            # Extract network prefix (assuming /24 subnet)
-            network_prefix = '.'.join(local_ip.split('.')[:3])
-            return network_prefix
+            sock.connect(('10.255.255.255', 1))
+            return sock.getsockname()[0]
+        finally:
+            sock.close()
+    
+    def get_netmask(self, local_ip):
+        """Get the netmask of the interface holding local_ip"""
+        if psutil is not None:
+            for addrs in psutil.net_if_addrs().values():
+                for addr in addrs:
+                    if addr.family == socket.AF_INET and addr.address == local_ip and addr.netmask:
+                        return addr.netmask
+        # Assume a /24 subnet when the real mask is unknown
+        return "255.255.255.0"
+    
+    def get_local_network(self):
+        """Get the local network"""
+        try:
+            local_ip = self.get_local_ip()
+            network = ipaddress.ip_network(f"{local_ip}/{self.get_netmask(local_ip)}", strict=False)
+            if network.num_addresses > 4096:
+                print(f"Network {network} is too large to scan, limiting to the local /24")
+                network = ipaddress.ip_network(f"{local_ip}/24", strict=False)
+            return network
         except Exception as e:
-            print(f"Error getting network prefix: {e}")
+            print(f"Error getting local network: {e}")
             # Fallback to common home network
-            return "192.168.1"
+            return ipaddress.ip_network("192.168.1.0/24")
     
-    def scan_port(self):
-        """Scan the port for each IP in the queue"""
-        while not self.ip_queue.empty():
-            ip = self.ip_queue.get()
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(0.5)
-                result = sock.connect_ex((ip, 5555))
-                if result == 0:
-                    with self.print_lock:
-                        self.open_ips.append(ip)
+    def _found(self, ip):
+        """Record an open IP and report it right away"""
+        self.open_ips.append(ip)
+        if self._on_found:
+            self._on_found(ip)
+    
+    def get_hosts(self, network):
+        """Get the IPs to probe on a network, formatted once per network"""
+        if network != self._network:
+            self._network = network
+            self._hosts = [str(host) for host in network.hosts()]
+        return self._hosts
+    
+    def discover_mdns(self):
+        """Collect the IPs of devices advertising ADB over mDNS"""
+        found = []
+        
+        def on_service_state_change(zeroconf, service_type, name, state_change):
+            if state_change is not ServiceStateChange.Added:
+                return
+            info = zeroconf.get_service_info(service_type, name)
+            # Only plain ADB over TCP on port 5555 can be used with --tcpip
+            if info and info.port == 5555:
+                for ip in info.parsed_addresses(IPVersion.V4Only):
+                    if ip not in found:
+                        found.append(ip)
+                        self._found(ip)
+        
+        try:
+            zc = Zeroconf()
+        except OSError as e:
+            print(f"mDNS discovery unavailable: {e}")
+            return []
+        try:
+            ServiceBrowser(zc, "_adb._tcp.local.", handlers=[on_service_state_change])
+            time.sleep(1.5)
+        finally:
+            zc.close()
+        return found
+    
+    def _connect_timeout(self):
+        """Connect timeout for a sweep, adapted to recently seen RTTs"""
+        if not self.rtts:
+            return 0.5
+        # Twice the 90th percentile of successful connects, within [0.05, 0.5]
+        p90 = sorted(self.rtts)[int(len(self.rtts) * 0.9)]
+        return min(0.5, max(0.05, p90 * 2))
+    
+    def _new_socket(self):
+        """Create a non-blocking TCP socket for a probe"""
+        if hasattr(socket, 'SOCK_NONBLOCK'):
+            # Linux sets the flag in socket() itself, saving an ioctl per probe
+            return socket.socket(socket.AF_INET, socket.SOCK_STREAM | socket.SOCK_NONBLOCK)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        return sock
+    
+    def _reset_on_close(self, sock):
+        """Make close() reset a probe connection instead of shutting it down"""
+        # With a zero linger the device gets a RST, and neither side keeps the
+        # connection around in FIN_WAIT/TIME_WAIT across repeated scans
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+    
+    def _probe_select(self, ips, timeout):
+        """Probe all IPs with non-blocking connects watched by one selector"""
+        selector = selectors.DefaultSelector()
+        todo = iter(ips)
+        # Connects in progress, oldest first: sock -> (ip, start)
+        pending = {}
+        try:
+            while True:
+                # Keep up to max_inflight connects in progress
+                while len(pending) < self.max_inflight:
+                    ip = next(todo, None)
+                    if ip is None:
+                        break
+                    sock = self._new_socket()
+                    start = time.monotonic()
+                    err = sock.connect_ex((ip, 5555))
+                    if err in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                        selector.register(sock, selectors.EVENT_WRITE)
+                        pending[sock] = (ip, start)
+                        continue
+                    if err == 0:
+                        self.rtts.append(time.monotonic() - start)
+                        self._found(ip)
+                        self._reset_on_close(sock)
+                    sock.close()
+                
+                if not pending:
+                    break
+                
+                # Sleep until a connect completes or the oldest one expires
+                _, oldest_start = next(iter(pending.values()))
+                wait = max(0, oldest_start + timeout - time.monotonic())
+                for key, _ in selector.select(wait):
+                    sock = key.fileobj
+                    ip, start = pending.pop(sock)
+                    selector.unregister(sock)
+                    if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                        self.rtts.append(time.monotonic() - start)
+                        self._found(ip)
+                        self._reset_on_close(sock)
+                    sock.close()
+                
+                # Give up on connects that have used their whole timeout
+                now = time.monotonic()
+                for sock, (ip, start) in list(pending.items()):
+                    if now - start < timeout:
+                        break
+                    del pending[sock]
+                    selector.unregister(sock)
+                    sock.close()
+        finally:
+            for sock in pending:
+                sock.close()
+            selector.close()
+    
+    def _probe_uring(self, ips, timeout, done):
+        """Probe all IPs with connects submitted in a single io_uring batch"""
+        ring = liburing.Ring()
+        cqe = liburing.Cqe()
+        flags = liburing.IORING_SETUP_SINGLE_ISSUER | liburing.IORING_SETUP_DEFER_TASKRUN
+        # One submission queue entry per IP so the whole batch is one submit
+        liburing.io_uring_queue_init(len(ips), ring, flags)
+        
+        # The binding's io_uring waits hold the GIL, which would freeze the
+        # UI for the whole sweep. Have the ring signal an eventfd instead
+        # and wait on that with a selector, which releases it.
+        efd = os.eventfd(0, os.EFD_NONBLOCK)
+        selector = selectors.DefaultSelector()
+        pending = {}
+        try:
+            liburing.io_uring_register_eventfd(ring, efd)
+            selector.register(efd, selectors.EVENT_READ)
+            
+            for ip in ips:
+                sock = self._new_socket()
+                # Keep the address alive until the ring has consumed it
+                addr = liburing.Sockaddr(socket.AF_INET, ip, 5555)
+                pending[sock.fileno()] = (ip, sock, addr)
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_connect(sqe, sock.fileno(), addr)
+                liburing.io_uring_sqe_set_data64(sqe, sock.fileno())
+            start = time.monotonic()
+            liburing.io_uring_submit(ring)
+            
+            # Reap completions until everything has answered or the timeout expires
+            deadline = start + timeout
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if not selector.select(remaining):
+                    break
+                os.eventfd_read(efd)
+                # Run the completions held back by DEFER_TASKRUN, then handle
+                # every one that is ready so a burst costs a single wait
+                liburing.io_uring_get_events(ring)
+                ready = liburing.io_uring_cq_ready(ring)
+                if not ready:
+                    continue
+                liburing.io_uring_peek_cqe(ring, cqe)
+                for i in range(ready):
+                    entry = cqe[i]
+                    ip, sock, _ = pending.pop(entry.user_data)
+                    # Answered one way or the other, never probe it again
+                    done.add(ip)
+                    try:
+                        # res raises for failed connects (refused, unreachable...)
+                        entry.res
+                        self.rtts.append(time.monotonic() - start)
+                        self._found(ip)
+                        self._reset_on_close(sock)
+                    except OSError:
+                        pass
+                    sock.close()
+                liburing.io_uring_cq_advance(ring, ready)
+        finally:
+            # Exiting the ring cancels any connect still in flight
+            liburing.io_uring_queue_exit(ring)
+            selector.close()
+            os.close(efd)
+            for _, sock, _ in pending.values():
                 sock.close()
-            except:
-                pass
-            finally:
-                self.ip_queue.task_done()
     
-    def scan_network(self):
+    def _sweep(self, ips, timeout):
+        """Probe each IP once"""
+        # io_uring submits everything as one batch that waits out the whole
+        # timeout. Larger networks go to the selector backend, which keeps
+        # max_inflight connects going with a sliding window instead.
+        # Waiting on the ring's eventfd needs os.eventfd (Python 3.10+)
+        if liburing is not None and hasattr(os, 'eventfd') and len(ips) <= self.max_inflight:
+            done = set()
+            try:
+                self._probe_uring(ips, timeout, done)
+                return
+            except OSError as e:
+                # Kernel too old or io_uring disabled, use the selector backend
+                print(f"io_uring unavailable, falling back to selectors: {e}")
+            # IPs that already answered have been reported, don't list them twice
+            ips = [ip for ip in ips if ip not in done]
+        
+        # All probes share one selector (epoll on Linux), so the whole
+        # sweep takes roughly a single connect timeout
+        self._probe_select(ips, timeout)
+    
+    def scan_network(self, on_found=None):
         """Scan the entire local network for devices with port 5555 open"""
-        network_prefix = self.get_network_prefix()
+        self.open_ips = []
+        self._on_found = on_found
         
-        # Put all IPs in the queue
-        for i in range(1, 255):
-            ip = f"{network_prefix}.{i}"
-            self.ip_queue.put(ip)
+        # Only fall back to the TCP sweep if nothing answers over mDNS
+        if Zeroconf is not None and self.discover_mdns():
+            return self.open_ips
         
-        # Create threads to scan ports
-        threads = []
-        for _ in range(100):  # Use 100 threads for faster scanning
-            t = threading.Thread(target=self.scan_port)
-            t.daemon = True
-            threads.append(t)
-            t.start()
+        ips = self.get_hosts(self.get_local_network())
+        # Probe in random order so routers don't rate-limit a sequential
+        # burst of ARP requests for .1, .2, .3, ...
+        random.shuffle(ips)
         
-        # Wait for all tasks to complete
-        self.ip_queue.join()
+        # One pass with a timeout tuned to how fast devices answered before
+        self._sweep(ips, self._connect_timeout())
         
         return self.open_ips
 
@@ -79,8 +324,12 @@ def launch_scrcpy(ip):
     """Launch scrcpy with the selected IP"""
     try:
         print(f"\nLaunching scrcpy to connect to {ip}...")
-        cmd = f"scrcpy --tcpip={ip}:5555"
-        subprocess.Popen(cmd, shell=True)
+        subprocess.Popen(
+            ['scrcpy', f'--tcpip={ip}:5555'], 
+            stdout=subprocess.DEVNULL, 
+            stderr=subprocess.DEVNULL, 
+            start_new_session=True
+        )
         return True
     except Exception as e:
         print(f"Error launching scrcpy: {e}")
@@ -93,6 +342,29 @@ class ScannerApp:
         self.root.geometry("500x400")
         self.root.resizable(True, True)
         
+        # Reused across scans so connect timeouts can adapt
+        self.scanner = IPScanner()
+        self._scan_inflight = False
+        # Whether the running scan was started from the Scan button
+        self._scan_from_user = False
+        
+        # Devices found by the scan thread, waiting to be added to the list
+        self._pending_devices = []
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        
+        # X display used to send keys in-process when python-xlib is available
+        self._display = None
+        if xdisplay is not None:
+            try:
+                self._display = xdisplay.Display()
+            except xerror.DisplayError as e:
+                print(f"Cannot open X display, falling back to xdotool: {e}")
+        
+        # The scrcpy X window, kept until sending keys to it stops working
+        self._scrcpy_wid = None
+        self._key_lock = threading.Lock()
+        
         # We no longer need to track screen state with separate buttons
         # The previous state tracking variable has been removed
         
@@ -105,6 +377,13 @@ class ScannerApp:
         # Set up the UI
         self.setup_ui()
         
+        # Our own windows, so the GUI never mistakes itself for scrcpy
+        self._own_windows = self.get_own_windows() if self._display else set()
+        
+        # Start the first scan once the main loop is running, so the
+        # device list is filling up while the window is drawn
+        self.root.after(50, self.start_scan, False)
+        
     def center_window(self):
         """Center the window on the screen"""
         self.root.update_idletasks()
@@ -116,10 +395,7 @@ class ScannerApp:
         
     def check_scrcpy(self):
         """Check if scrcpy is installed"""
-        try:
-            subprocess.run(['which', 'scrcpy'], check=True, stdout=subprocess.PIPE)
-            return True
-        except subprocess.CalledProcessError:
+        if shutil.which('scrcpy') is None:
             messagebox.showerror(
                 "Error", 
                 "scrcpy is not installed. Please install it first.\n"
@@ -127,6 +403,7 @@ class ScannerApp:
             )
             self.root.quit()
             return False
+        return True
     
     def setup_ui(self):
         """Set up the user interface"""
@@ -219,8 +496,14 @@ class ScannerApp:
         # Double-click binding for list items
         self.device_listbox.bind('<Double-1>', lambda e: self.connect_to_device())
         
-    def start_scan(self):
+    def start_scan(self, from_user=True):
         """Start scanning the network"""
+        # Coalesce with a scan that is already running
+        if self._scan_inflight:
+            return
+        self._scan_inflight = True
+        self._scan_from_user = from_user
+        
         self.status_label.config(text="Scanning network for devices with port 5555 open...")
         self.scan_button.config(state=tk.DISABLED)
         self.device_listbox.delete(0, tk.END)
@@ -232,34 +515,60 @@ class ScannerApp:
     
     def scan_thread(self):
         """Background thread for scanning"""
-        scanner = IPScanner()
-        self.devices = scanner.scan_network()
+        self.devices = self.scanner.scan_network(on_found=self.queue_device)
         
         # Update UI from main thread
         self.root.after(0, self.update_device_list)
+    
+    def queue_device(self, ip):
+        """Queue a device found by the scan thread for the device list"""
+        with self._pending_lock:
+            self._pending_devices.append(ip)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        # Batch devices found close together into a single UI update
+        self.root.after(50, self.flush_devices)
+    
+    def flush_devices(self):
+        """Add the queued devices to the device list"""
+        with self._pending_lock:
+            devices = self._pending_devices
+            self._pending_devices = []
+            self._flush_scheduled = False
+        
+        if not devices:
+            return
+        for ip in devices:
+            self.device_listbox.insert(tk.END, ip)
+        self.connect_button.config(state=tk.NORMAL)
+        if self._scan_inflight:
+            self.status_label.config(text=f"Scanning... found {self.device_listbox.size()} device(s) so far")
         
     def update_device_list(self):
         """Update the device list in the UI"""
-        self.device_listbox.delete(0, tk.END)
+        # Devices were streamed in during the scan, only add the last ones
+        self.flush_devices()
         
         if not self.devices:
             self.status_label.config(text="No devices found. Make sure devices are on the same network with port 5555 open.")
             self.connect_button.config(state=tk.DISABLED)
-            messagebox.showinfo(
-                "No Devices Found", 
-                "No devices with port 5555 open found on the network.\n\n"
-                "Make sure your Android device:\n"
-                "1. Is connected to the same network\n"
-                "2. Has USB debugging enabled\n"
-                "3. Has ADB over TCP/IP enabled (run 'adb tcpip 5555' when connected via USB)"
-            )
+            # Don't pop up a dialog for the automatic scan at startup
+            if self._scan_from_user:
+                messagebox.showinfo(
+                    "No Devices Found", 
+                    "No devices with port 5555 open found on the network.\n\n"
+                    "Make sure your Android device:\n"
+                    "1. Is connected to the same network\n"
+                    "2. Has USB debugging enabled\n"
+                    "3. Has ADB over TCP/IP enabled (run 'adb tcpip 5555' when connected via USB)"
+                )
         else:
-            self.status_label.config(text=f"Found {len(self.devices)} device(s) with port 5555 open")
-            for ip in self.devices:
-                self.device_listbox.insert(tk.END, ip)
+            self.status_label.config(text=f"Scan complete. Found {len(self.devices)} device(s) with port 5555 open")
             self.connect_button.config(state=tk.NORMAL)
             
         self.scan_button.config(state=tk.NORMAL)
+        self._scan_inflight = False
         
     def connect_to_device(self):
         """Connect to the selected device"""
@@ -268,7 +577,7 @@ class ScannerApp:
             messagebox.showinfo("Selection Required", "Please select a device first.")
             return
             
-        selected_ip = self.devices[selected_index[0]]
+        selected_ip = self.device_listbox.get(selected_index[0])
         self.status_label.config(text=f"Connecting to {selected_ip}...")
         
         # Launch scrcpy in a separate thread to avoid freezing UI
@@ -276,68 +585,179 @@ class ScannerApp:
         thread.daemon = True
         thread.start()
         
-    def find_scrcpy_window(self):
-        """Find the scrcpy window and return its window ID"""
-        # Try to find all scrcpy windows using a pattern match instead of exact name
-        find_cmd = subprocess.run(
-            ['xdotool', 'search', '--class', 'scrcpy'], 
-            capture_output=True, 
-            text=True
+    def get_own_windows(self):
+        """Get the IDs of this app's X windows, which are never scrcpy"""
+        own = {self.root.winfo_id(), int(self.root.wm_frame(), 16)}
+        try:
+            # The wrapper around the toplevel is what the window manager lists
+            toplevel = self._display.create_resource_object('window', self.root.winfo_id())
+            own.add(toplevel.query_tree().parent.id)
+        except xerror.XError:
+            pass
+        return own
+    
+    def has_scrcpy_class(self, window):
+        """Check the WM_CLASS class like 'xdotool search --class scrcpy'"""
+        # Tk names its own class after the script, e.g. ('guiscrcpy', 'Tk'),
+        # so only an exact match on the class field is safe
+        wm_class = window.get_wm_class()
+        return bool(wm_class) and wm_class[1] == 'scrcpy'
+    
+    def has_scrcpy_name(self, window):
+        """Check whether an X window's title mentions scrcpy"""
+        wm_name = window.get_wm_name() or ''
+        if isinstance(wm_name, bytes):
+            wm_name = wm_name.decode(errors='replace')
+        return 'scrcpy' in wm_name.lower()
+    
+    def is_scrcpy_window(self, window):
+        """Check whether an X window belongs to scrcpy"""
+        if window.id in self._own_windows:
+            return False
+        return self.has_scrcpy_class(window) or self.has_scrcpy_name(window)
+    
+    def get_client_list(self):
+        """Get the top-level window IDs from the window manager, if it lists them"""
+        # EWMH window managers keep every top-level window in one property
+        root = self._display.screen().root
+        clients = root.get_full_property(
+            self._display.intern_atom('_NET_CLIENT_LIST'), 
+            X.AnyPropertyType
         )
+        return list(clients.value) if clients else None
+    
+    def find_scrcpy_window(self, clients):
+        """Find the scrcpy window among the window manager's clients"""
+        # Use the latest window (usually the last in the list)
+        windows = [
+            self._display.create_resource_object('window', wid) 
+            for wid in reversed(clients) if wid not in self._own_windows
+        ]
+        # Like the xdotool search: match the class first, and the window
+        # name only if no window has the scrcpy class
+        for matches in (self.has_scrcpy_class, self.has_scrcpy_name):
+            for window in windows:
+                try:
+                    if matches(window):
+                        return window
+                except xerror.XError:
+                    # The window was destroyed while we were looking at it
+                    continue
+        return None
+    
+    def send_key_to_window(self, window, key_command):
+        """Send a keyboard shortcut straight to a window without focusing it"""
+        # Same event sequence as 'xdotool key --window', e.g. for 'alt+shift+o':
+        # press Alt_L, Shift_L, o, then release o, Shift_L, Alt_L. SDL tracks
+        # modifiers from their own key events, not from the state field.
+        *modifiers, key = key_command.split('+')
+        modifier_keys = {
+            'alt': ('Alt_L', X.Mod1Mask), 
+            'shift': ('Shift_L', X.ShiftMask), 
+            'ctrl': ('Control_L', X.ControlMask),
+        }
+        
+        def keycode(name):
+            return self._display.keysym_to_keycode(XK.string_to_keysym(name))
+        
+        # (event class, keycode, state before the event)
+        events = []
+        state = 0
+        for modifier in modifiers:
+            name, mask = modifier_keys[modifier]
+            events.append((xevent.KeyPress, keycode(name), state))
+            state |= mask
+        events.append((xevent.KeyPress, keycode(key), state))
+        events.append((xevent.KeyRelease, keycode(key), state))
+        for modifier in reversed(modifiers):
+            name, mask = modifier_keys[modifier]
+            events.append((xevent.KeyRelease, keycode(name), state))
+            state &= ~mask
         
-        if not find_cmd.stdout.strip():
-            # Try alternative search if the class approach didn't work
-            find_cmd = subprocess.run(
-                ['xdotool', 'search', '--name', 'scrcpy'], 
-                capture_output=True, 
-                text=True
-            )
-        
-        if not find_cmd.stdout.strip():
-            # Try one more approach - search for any window containing "scrcpy" in the name
-            find_cmd = subprocess.run(
-                ['xdotool', 'search', '--onlyvisible', '--name', '.*scrcpy.*'], 
-                capture_output=True, 
-                text=True
+        try:
+            # Window IDs get reused, so make sure this is still scrcpy
+            if not self.is_scrcpy_window(window):
+                return False
+            root = self._display.screen().root
+            for event_class, detail, event_state in events:
+                window.send_event(event_class(
+                    time=X.CurrentTime, root=root, window=window, 
+                    same_screen=1, child=X.NONE, 
+                    root_x=0, root_y=0, event_x=0, event_y=0, 
+                    state=event_state, detail=detail
+                ), propagate=True)
+            self._display.sync()
+            return True
+        except xerror.XError:
+            return False
+    
+    def send_key_with_xlib(self, key_command):
+        """Send a keyboard shortcut to the scrcpy window through python-xlib"""
+        if self._scrcpy_wid:
+            if self.send_key_to_window(self._scrcpy_wid, key_command):
+                return True
+            # The cached window is gone (scrcpy was closed or restarted)
+            self._scrcpy_wid = None
+        
+        clients = self.get_client_list()
+        if clients is None:
+            # Window manager without EWMH, let xdotool walk the window tree
+            return self.send_key_with_xdotool(key_command)
+        
+        self._scrcpy_wid = self.find_scrcpy_window(clients)
+        return bool(self._scrcpy_wid) and self.send_key_to_window(self._scrcpy_wid, key_command)
+    
+    def send_key_with_xdotool(self, key_command):
+        """Find the scrcpy window and send it a shortcut in a single xdotool run"""
+        # Try the window class first, then the window name (a regex)
+        for search in (['--class', 'scrcpy'], ['--name', 'scrcpy']):
+            # 'search' fails when nothing matches, otherwise %@ makes 'key'
+            # target every window it found
+            result = subprocess.run(
+                ['xdotool', 'search', *search, 'key', '--window', '%@', key_command], 
+                capture_output=True
             )
-            
-        if find_cmd.stdout.strip():
-            window_ids = find_cmd.stdout.strip().split('\n')
-            # Use the latest window (usually the last in the list)
-            return window_ids[-1]
-        else:
-            return None
+            if result.returncode == 0:
+                return True
+        return False
     
     def send_key_to_scrcpy(self, key_command, status_message, result_message):
         """Send a keyboard shortcut to the scrcpy window"""
-        window_id = self.find_scrcpy_window()
+        # Display a message to inform the user
+        self.status_label.config(text=status_message)
         
-        if window_id:
-            # Display a message to inform the user
-            self.status_label.config(text=f"Focusing scrcpy window and {status_message}")
-            
-            # Update the UI to show immediate feedback
-            self.root.update_idletasks()
-            
-            # Give the GUI time to update
-            time.sleep(0.1)
-            
-            # Focus on the scrcpy window (use windowactivate for reliable focusing)
-            subprocess.run(['xdotool', 'windowactivate', '--sync', window_id])
-            
-            # Wait for window to be active
-            time.sleep(0.3)
-            
-            # Send keyboard shortcut using xdotool
-            subprocess.run(['xdotool', 'key', key_command])
-            
+        # Send from a separate thread so xdotool or the X server never
+        # block the UI
+        thread = threading.Thread(target=self.key_thread, args=(key_command, result_message))
+        thread.daemon = True
+        thread.start()
+    
+    def key_thread(self, key_command, result_message):
+        """Background thread for sending a keyboard shortcut"""
+        try:
+            # One press at a time, the X display is shared between threads
+            with self._key_lock:
+                if self._display:
+                    sent = self.send_key_with_xlib(key_command)
+                else:
+                    sent = self.send_key_with_xdotool(key_command)
+        except Exception as e:
+            error = f"Error sending {key_command} to scrcpy: {e}"
+            print(error)
+            self.root.after(0, lambda: self.status_label.config(text=error))
+            return
+        
+        # Update UI from main thread
+        self.root.after(0, lambda: self.key_sent(sent, result_message))
+    
+    def key_sent(self, sent, result_message):
+        """Show the outcome of sending a keyboard shortcut"""
+        if sent:
             # Update status label
             self.status_label.config(text=result_message)
-            return True
         else:
             self.status_label.config(text="No scrcpy window found. Launch scrcpy first.")
             messagebox.showinfo("No Window Found", "No scrcpy window found. Please connect to a device first.")
-            return False
     
     def screen_off(self):
         """Turn the device screen off by sending Alt+O to the scrcpy window"""